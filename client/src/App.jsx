@@ -297,6 +297,10 @@ function App() {
       return `Search results:\n${emailList}`;
     }
 
+    if (response.status === "Multiple ✅" && response.results) {
+      return response.results.map(formatMessage).join('\n\n');
+    }
+
     if (response.status === "Need Info ❓") {
       return response.message || "I need more information to proceed.";
     }
@@ -0,0 +1,25 @@
+import os
+import logging
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+    # Each worker would otherwise generate its own key and reject the others' JWTs
+    if workers > 1 and not os.getenv("SECRET_KEY"):
+        logger.warning("SECRET_KEY is not set; auth tokens will not be valid across workers.")
+
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+    )
@@ -1,17 +1,33 @@
-from fastapi import FastAPI, HTTPException, Request, Cookie
+from fastapi import FastAPI, HTTPException, Request, Cookie, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, RedirectResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict
 from dotenv import load_dotenv
-import re, json, os, secrets
+import json, os, secrets, hashlib, html
+import asyncio
+import threading
+import time
+import anyio
+import orjson
 from datetime import datetime, timedelta
 import logging
 import jwt
 from typing import Optional
+from contextlib import asynccontextmanager
+from cachetools import TTLCache, TLRUCache
 
-from utils.gemini import call_gemini
-from utils.google_auth import get_credentials_from_token, get_auth_url, exchange_code
-from googleapiclient.discovery import build
+# Load .env once, before the utils modules read their settings at import
+load_dotenv()
+
+from utils.gemini import call_gemini, close_client as close_gemini_client
+from utils import memoize
+from utils.google_auth import get_credentials_from_token, get_auth_url, exchange_code, to_token_json
+from utils.google_service import (
+    warm_discovery_docs,
+    fetch_user_info,
+    close_client as close_google_client
+)
 from utils.calendar_task import (
     create_calendar_event,
     check_schedule,
@@ -19,13 +35,25 @@ from utils.calendar_task import (
 )
 from utils.gmail_task import summarize_emails, send_email, list_unread, search_email
 
-load_dotenv()
-
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Threads available for blocking Google API calls
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The anyio default of 40 threads would cap concurrent Google calls per worker
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    memoize.load()
+    warm_discovery_docs()
+    yield
+    memoize.save()
+    await close_gemini_client()
+    await close_google_client()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -36,22 +64,114 @@ if not SECRET_KEY:
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# OAuth popup pages, encoded once at import
+_AUTH_SUCCESS_HTML: bytes = b"""<!DOCTYPE html>
+<html>
+<head><title>Authentication Complete</title></head>
+<body>
+    <script>
+        const message = {
+            type: 'oauth_success',
+            authorized: 'true'
+        };
+        if (window.opener) {
+            window.opener.postMessage(message, "*");
+        }
+        window.close();
+    </script>
+    <p>Authentication successful. You can close this window.</p>
+</body>
+</html>
+"""
+
+_AUTH_SUCCESS_HEADERS = {
+    "content-length": str(len(_AUTH_SUCCESS_HTML)),
+    "cache-control": "no-store"
+}
+
+_AUTH_NO_CODE_HTML: bytes = b"<html><body>Error: No authorization code received.</body></html>"
+
+_AUTH_ERROR_PREFIX: bytes = b"""<!DOCTYPE html>
+<html>
+<head><title>Authentication Error</title></head>
+<body>
+    <script>
+        const message = """
+_AUTH_ERROR_MIDDLE: bytes = b""";
+        if (window.opener) {
+            window.opener.postMessage(message, "*");
+        }
+        window.close();
+    </script>
+    <p>Authentication failed: """
+_AUTH_ERROR_SUFFIX: bytes = b"""</p>
+</body>
+</html>
+"""
+
+def _auth_error_page(error: str, details: Optional[str] = None) -> bytes:
+    """Render the OAuth error popup with the error safely escaped for JS and HTML"""
+    message = {"type": "oauth_error", "authorized": "false", "error": error}
+    if details:
+        message["details"] = details
+    # Escape "<" so the value cannot close the <script> element
+    js_message = json.dumps(message).replace("<", "\\u003c").encode()
+    return (
+        _AUTH_ERROR_PREFIX
+        + js_message
+        + _AUTH_ERROR_MIDDLE
+        + html.escape(details or error).encode()
+        + _AUTH_ERROR_SUFFIX
+    )
+
+# Comma-separated list of exact origins; never "*" since cookies are sent cross-site
+DEFAULT_ALLOWED_ORIGINS = (
+    "https://evernote-ai.netlify.app,"
+    "http://localhost:5173,"
+    "https://smart-to-do-list-yy8z.onrender.com"
+)
+# Set so each origin check is a hash lookup however long the list gets
+ALLOWED_ORIGINS = frozenset(
+    origin.strip()
+    for origin in os.getenv("ALLOWED_ORIGINS", DEFAULT_ALLOWED_ORIGINS).split(",")
+    if origin.strip()
+)
+# Optional pattern for origins that can't be listed up front (e.g. preview deploys)
+CORS_ORIGIN_REGEX = os.getenv("CORS_ORIGIN_REGEX") or None
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "https://evernote-ai.netlify.app", 
-        "http://localhost:5173", 
-        "https://smart-to-do-list-yy8z.onrender.com"
-    ],
+    allow_origins=ALLOWED_ORIGINS,
+    allow_origin_regex=CORS_ORIGIN_REGEX,
     allow_credentials=True,  # CRITICAL: Must be True for cookies
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
     expose_headers=["*"]  # Added to expose headers if needed
 )
+
+class HealthCheckMiddleware:
+    """Answer GET /health before CORS handling and routing (liveness probes hit it constantly)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+            await _HEALTHY_RESPONSE(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+# Added last so it wraps CORSMiddleware
+app.add_middleware(HealthCheckMiddleware)
+
 class TaskInput(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     task: str
 
 class AuthCodeInput(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     code: str
 
 def create_jwt_token(credentials_json: str) -> str:
@@ -63,11 +183,31 @@ def create_jwt_token(credentials_json: str) -> str:
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
+# Verified tokens: raw token -> (credentials JSON, exp as epoch seconds).
+# A browser sends the same cookie for up to a day, so skip the HMAC and decode on repeats.
+_JWT_CACHE = {}
+_JWT_CACHE_MAX = 1024
+_JWT_CACHE_LOCK = threading.Lock()
+
 def verify_jwt_token(token: str) -> Optional[str]:
     """Verify JWT token and return credentials JSON"""
+    cached = _JWT_CACHE.get(token)
+    if cached is not None:
+        if time.time() < cached[1]:
+            return cached[0]
+        with _JWT_CACHE_LOCK:
+            _JWT_CACHE.pop(token, None)
+        logger.info("JWT token expired")
+        return None
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload.get("credentials")
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM], options={"require": ["exp"]})
+        credentials_json = payload.get("credentials")
+        with _JWT_CACHE_LOCK:
+            if len(_JWT_CACHE) >= _JWT_CACHE_MAX:
+                _JWT_CACHE.pop(next(iter(_JWT_CACHE)), None)
+            _JWT_CACHE[token] = (credentials_json, payload["exp"])
+        return credentials_json
     except jwt.ExpiredSignatureError:
         logger.info("JWT token expired")
         return None
@@ -76,7 +216,11 @@ def verify_jwt_token(token: str) -> Optional[str]:
         return None
 
 def get_credentials_from_request(request: Request) -> Optional:
-    """Get credentials from JWT token in request"""
+    """Get credentials from JWT token in request.
+
+    Returns None unless the credentials are valid (refreshed if needed),
+    so callers don't have to check creds.valid again.
+    """
     # Try to get token from cookie
     auth_token = request.cookies.get("auth_token")
     
@@ -95,82 +239,95 @@ def get_credentials_from_request(request: Request) -> Optional:
     
     return get_credentials_from_token(credentials_json)
 
+# Profile lookups keyed by a hash of the access token. Each entry stores its own
+# lifetime: at most five minutes, and never past 30s before the token expires.
+USER_INFO_TTL = 300
+_USER_INFO_CACHE = TLRUCache(maxsize=10_000, ttu=lambda _key, value, now: now + value[0])
+
+def _user_info_ttl(creds) -> float:
+    if creds.expiry is None:
+        return USER_INFO_TTL
+    remaining = (creds.expiry - datetime.utcnow()).total_seconds() - 30
+    return max(0, min(USER_INFO_TTL, remaining))
+
+async def get_user_info(creds) -> dict:
+    """Fetch the user's profile, reusing it while the same access token is in use"""
+    key = hashlib.blake2b(creds.token.encode(), digest_size=16).hexdigest()
+    entry = _USER_INFO_CACHE.get(key)
+    if entry is not None:
+        return entry[1]
+
+    user_info = await fetch_user_info(creds)
+    ttl = _user_info_ttl(creds)
+    if ttl > 0:
+        _USER_INFO_CACHE[key] = (ttl, user_info)
+    return user_info
+
+# Only parses of read-only requests are memoized; a repeated write command
+# (send an email, schedule a call) always gets a fresh parse from Gemini.
+# The same actions are safe to run side by side for a "multiple" request.
+_READ_ONLY_ACTIONS = frozenset({
+    "check_schedule",
+    "check_availability",
+    "summarize_emails",
+    "list_unread",
+    "search_email",
+})
+
+def _is_memoizable(raw_response: str) -> bool:
+    try:
+        parsed = orjson.loads(raw_response)
+    except orjson.JSONDecodeError:
+        return False
+    return isinstance(parsed, dict) and parsed.get("action") in _READ_ONLY_ACTIONS
+
+async def call_gemini_memoized(task: str) -> str:
+    """Call Gemini, reusing the response for a read-only task already seen today"""
+    cached = memoize.get(task)
+    if cached is not None:
+        return cached
+
+    raw_response = await call_gemini(task)
+    if _is_memoizable(raw_response):
+        memoize.put(task, raw_response)
+    return raw_response
+
 @app.get("/authorize")
-def authorize(request: Request):
+async def authorize(request: Request):
     """Get Google OAuth authorization URL"""
     try:
         origin = request.query_params.get("origin")
-        auth_url, state = get_auth_url(origin=origin)
+        auth_url, state = await run_in_threadpool(get_auth_url, origin=origin)
         
         return {"auth_url": auth_url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get auth URL: {str(e)}")
 
 @app.get("/oauth2callback")
-def oauth2callback_get(request: Request):
+async def oauth2callback_get(request: Request):
     """Handle OAuth callback, exchange code, and close the popup."""
     code = request.query_params.get('code')
     error = request.query_params.get('error')
     origin = request.query_params.get('origin')
 
-    logger.info(f"OAuth callback received: code={code is not None}, error={error}, origin={origin}")
+    logger.info("OAuth callback received: code=%s, error=%s, origin=%s", code is not None, error, origin)
 
     if error:
-        logger.error(f"OAuth error from Google: {error}")
-        html_response_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head><title>Authentication Error</title></head>
-        <body>
-            <script>
-                const message = {{
-                    type: 'oauth_error',
-                    authorized: 'false',
-                    error: '{error}'
-                }};
-                if (window.opener) {{
-                    window.opener.postMessage(message, "*");
-                }}
-                window.close();
-            </script>
-            <p>Authentication failed: {error}</p>
-        </body>
-        </html>
-        """
-        return HTMLResponse(content=html_response_content)
+        logger.error("OAuth error from Google: %s", error)
+        return HTMLResponse(content=_auth_error_page(error))
 
     if not code:
         logger.error("No authorization code received.")
-        return HTMLResponse(content="<html><body>Error: No authorization code received.</body></html>", status_code=400)
+        return HTMLResponse(content=_AUTH_NO_CODE_HTML, status_code=400)
 
     try:
         logger.info("Exchanging authorization code for credentials...")
-        creds = exchange_code(code, origin)
+        creds = await run_in_threadpool(exchange_code, code, origin)
         
         # Create JWT token
-        jwt_token = create_jwt_token(creds.to_json())
-        
-        html_response_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>Authentication Complete</title></head>
-        <body>
-            <script>
-                const message = {
-                    type: 'oauth_success',
-                    authorized: 'true'
-                };
-                if (window.opener) {
-                    window.opener.postMessage(message, "*");
-                }
-                window.close();
-            </script>
-            <p>Authentication successful. You can close this window.</p>
-        </body>
-        </html>
-        """
+        jwt_token = create_jwt_token(to_token_json(creds))
         
-        response = HTMLResponse(content=html_response_content)
+        response = HTMLResponse(content=_AUTH_SUCCESS_HTML, headers=_AUTH_SUCCESS_HEADERS)
         
         response.set_cookie(
             "auth_token",
@@ -187,38 +344,18 @@ def oauth2callback_get(request: Request):
         return response
 
     except Exception as e:
-        logger.error(f"Failed to exchange code for credentials: {str(e)}")
-        error_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head><title>Authentication Error</title></head>
-        <body>
-            <script>
-                const message = {{
-                    type: 'oauth_error',
-                    authorized: 'false',
-                    error: 'token_exchange_failed',
-                    details: '{str(e)}'
-                }};
-                if (window.opener) {{
-                    window.opener.postMessage(message, "*");
-                }}
-                window.close();
-            </script>
-            <p>Authentication failed: {str(e)}</p>
-        </body>
-        </html>
-        """
+        logger.error("Failed to exchange code for credentials: %s", e)
+        error_html = _auth_error_page("token_exchange_failed", str(e))
         return HTMLResponse(content=error_html, status_code=400)
 
 @app.post("/oauth2callback")
-def oauth2callback_post(request: Request, data: AuthCodeInput):
+async def oauth2callback_post(request: Request, data: AuthCodeInput):
     """Handle OAuth callback with authorization code (POST request)"""
     try:
-        creds = exchange_code(data.code, None)
+        creds = await run_in_threadpool(exchange_code, data.code, None)
         
         # Create JWT token
-        jwt_token = create_jwt_token(creds.to_json())
+        jwt_token = create_jwt_token(to_token_json(creds))
         
         return {
             "message": "Authorization successful",
@@ -229,16 +366,15 @@ def oauth2callback_post(request: Request, data: AuthCodeInput):
         raise HTTPException(status_code=400, detail=f"Authorization failed: {str(e)}")
 
 @app.get("/check-auth")
-def check_auth(request: Request):
+async def check_auth(request: Request):
     """Check if user is authenticated"""
     try:
-        creds = get_credentials_from_request(request)
-        if not creds or not creds.valid:
+        creds = await run_in_threadpool(get_credentials_from_request, request)
+        if not creds:
             return {"authorized": False, "error": "Invalid credentials"}
 
         # Fetch user info
-        service = build('oauth2', 'v2', credentials=creds)
-        user_info = service.userinfo().get().execute()
+        user_info = await get_user_info(creds)
         
         return {
             "authorized": True,
@@ -247,16 +383,14 @@ def check_auth(request: Request):
             "picture": user_info.get("picture")
         }
     except Exception as e:
-        logger.error(f"Error checking auth: {str(e)}")
+        logger.error("Error checking auth: %s", e)
         return {"authorized": False, "error": str(e)}
 
 @app.post("/logout")
-def logout(request: Request):
+async def logout(request: Request):
     """Logout user and clear auth token"""
     try:
-        from fastapi.responses import JSONResponse
-        
-        response = JSONResponse(content={"message": "Logged out successfully"})
+        response = ORJSONResponse(content={"message": "Logged out successfully"})
         
         response.set_cookie(
             "auth_token",
@@ -271,148 +405,245 @@ def logout(request: Request):
         
         return response
     except Exception as e:
-        logger.error(f"Logout error: {str(e)}")
+        logger.error("Logout error: %s", e)
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
+# Short-lived cache for read-only Google lookups, keyed per user
+_READ_CACHE = TTLCache(maxsize=512, ttl=60)
+
+def _user_key(creds) -> str:
+    """Stable per-user cache key (the refresh token survives access-token refreshes)"""
+    secret = creds.refresh_token or creds.token
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+async def _cached_read(creds, parsed: dict, fn, *args):
+    """Run a read-only Google call, reusing a result from the last minute"""
+    key = (_user_key(creds), parsed["action"], parsed.get("date_time"), parsed.get("query"))
+    if key in _READ_CACHE:
+        return _READ_CACHE[key]
+
+    result = await run_in_threadpool(fn, creds, *args)
+    _READ_CACHE[key] = result
+    return result
+
+def _invalidate_reads(creds):
+    """Drop a user's cached reads after they change their data"""
+    user = _user_key(creds)
+    for key in [k for k in _READ_CACHE.keys() if k[0] == user]:
+        _READ_CACHE.pop(key, None)
+
+# Action handlers: each takes (creds, parsed, background_tasks) and returns the response dict
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+def _format_call_time(dt: datetime) -> str:
+    """Same output as strftime("%I:%M %p on %B %d"), without the locale-dependent lookups"""
+    hour = dt.hour % 12 or 12
+    meridiem = "AM" if dt.hour < 12 else "PM"
+    return f"{hour:02d}:{dt.minute:02d} {meridiem} on {_MONTHS[dt.month - 1]} {dt.day:02d}"
+
+_SCHEDULE_MSG_WITH_EMAIL = "✅ Scheduled a 30-minute call with {person} at {time}. Invite sent to {email}."
+_SCHEDULE_MSG_NO_EMAIL = "✅ Scheduled a 30-minute call with {person} at {time}."
+
+async def _handle_schedule_call(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    dt = datetime.fromisoformat(parsed["date_time"])
+    person = parsed.get("person", "someone")
+    email = parsed.get("email", None)
+
+    # Writes run before responding so a failed insert reaches the user as an error
+    event_link = await run_in_threadpool(
+        create_calendar_event,
+        creds,
+        person,
+        parsed["date_time"],
+        email,
+        parsed.get("repeat", "none")
+    )
+    _invalidate_reads(creds)
+
+    template = _SCHEDULE_MSG_WITH_EMAIL if email else _SCHEDULE_MSG_NO_EMAIL
+    message = template.format(person=person, time=_format_call_time(dt), email=email)
+
+    return {
+        "status": "Scheduled ✅",
+        "event": event_link,
+        "parsed": parsed,
+        "message": message
+    }
+
+async def _handle_check_schedule(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    schedule = await _cached_read(creds, parsed, check_schedule, parsed["date_time"])
+    return {
+        "status": "Schedule ✅",
+        "events": schedule,
+        "parsed": parsed
+    }
+
+async def _handle_check_availability(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    free_slots = await _cached_read(creds, parsed, check_availability, parsed["date_time"])
+    return {
+        "status": "Free Slots ✅",
+        "slots": free_slots,
+        "parsed": parsed
+    }
+
+async def _handle_summarize_emails(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    emails = await _cached_read(
+        creds,
+        parsed,
+        summarize_emails,
+        parsed.get("date_time"),
+        parsed.get("query")
+    )
+    return {
+        "status": "Summary ✅",
+        "emails": emails,
+        "parsed": parsed
+    }
+
+async def _handle_send_email(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    result = await run_in_threadpool(send_email, creds, parsed["email"], parsed["subject"], parsed["body"])
+    return {
+        "status": "Email Sent ✅",
+        "result": result,
+        "parsed": parsed
+    }
+
+async def _handle_list_unread(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    emails = await _cached_read(creds, parsed, list_unread, parsed["date_time"])
+    return {
+        "status": "Unread ✅",
+        "emails": emails,
+        "parsed": parsed
+    }
+
+async def _handle_search_email(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    emails = await _cached_read(creds, parsed, search_email, parsed["query"])
+    return {
+        "status": "Search ✅",
+        "emails": emails,
+        "parsed": parsed
+    }
+
+ACTION_HANDLERS = {
+    "schedule_call": _handle_schedule_call,
+    "check_schedule": _handle_check_schedule,
+    "check_availability": _handle_check_availability,
+    "summarize_emails": _handle_summarize_emails,
+    "send_email": _handle_send_email,
+    "list_unread": _handle_list_unread,
+    "search_email": _handle_search_email,
+}
+
+async def _run_batched_task(creds, task: dict, background_tasks: BackgroundTasks) -> dict:
+    action = task.get("action")
+    if action not in _READ_ONLY_ACTIONS:
+        return {
+            "status": "Parsed only",
+            "message": f"Please ask for \"{action}\" on its own.",
+            "parsed": task
+        }
+    if task.get("missing_fields"):
+        return {
+            "status": "Need Info ❓",
+            "message": f"To proceed, I need: {', '.join(task['missing_fields'])}.",
+            "parsed": task
+        }
+    return await ACTION_HANDLERS[action](creds, task, background_tasks)
+
+async def _handle_multiple(creds, parsed: dict, background_tasks: BackgroundTasks) -> dict:
+    """Run several independent lookups concurrently; writes are never batched"""
+    tasks = parsed.get("actions") or []
+    results = await asyncio.gather(
+        *(_run_batched_task(creds, task, background_tasks) for task in tasks),
+        return_exceptions=True
+    )
+    return {
+        "status": "Multiple ✅",
+        "results": [
+            {"status": "Error ❌", "error": str(r)} if isinstance(r, Exception) else r
+            for r in results
+        ],
+        "parsed": parsed
+    }
+
 @app.post("/parse-and-execute")
-def parse_and_execute(request: Request, data: TaskInput):
+async def parse_and_execute(request: Request, data: TaskInput, background_tasks: BackgroundTasks):
     """Parse natural language task and execute appropriate action"""
+    # Resolve credentials (may refresh the token) while Gemini is thinking
+    creds_task = asyncio.create_task(run_in_threadpool(get_credentials_from_request, request))
+    gemini_task = asyncio.create_task(call_gemini_memoized(data.task))
+
     # Check if user is authenticated first
     try:
-        creds = get_credentials_from_request(request)
-        if not creds or not creds.valid:
+        creds = await creds_task
+        if not creds:
             raise HTTPException(status_code=401, detail="User not authenticated. Please authorize with Google first.")
     except Exception as e:
+        gemini_task.cancel()
         raise HTTPException(status_code=401, detail="Authentication required. Please authorize with Google first.")
 
     try:
-        raw_response = call_gemini(data.task)
-        print(f"Raw response from Gemini: {raw_response}")
-
-        # Check if Gemini responded with a JSON task
-        if "{" in raw_response:
-            try:
-                # Extract JSON string from the raw response
-                match = re.search(r"\{.*\}", raw_response, re.DOTALL)
-                if not match:
-                    # Fallback if no JSON is found
-                    return {"status": "Processed ✅", "message": raw_response}
-
-                json_str = match.group(0)
-                parsed = json.loads(json_str)
-
-                if parsed.get("missing_fields"):
-                    # Properly format the list of missing fields
-                    missing_fields_str = ', '.join(parsed['missing_fields'])
-                    return {
-                        "status": "Need Info ❓",
-                        "message": f"To proceed, I need: {missing_fields_str}.",
-                        "parsed": parsed
-                    }
-                
-                # 1. Schedule Call
-                if parsed["action"] == "schedule_call":
-                    event_link = create_calendar_event(
-                        creds,
-                        parsed.get("person", "someone"),
-                        parsed["date_time"],
-                        parsed.get("email"),
-                        parsed.get("repeat", "none")
-                    )
-
-                    dt = datetime.fromisoformat(parsed["date_time"])
-                    formatted_time = dt.strftime("%I:%M %p on %B %d")
-                    person = parsed.get("person", "someone")
-                    email = parsed.get("email", None)
-
-                    message = f"✅ Scheduled a 30-minute call with {person} at {formatted_time}."
-                    if email:
-                        message += f" Invite sent to {email}."
-
-                    return {
-                        "status": "Scheduled ✅",
-                        "event": event_link,
-                        "parsed": parsed,
-                        "message": message
-                    }
-
-                # 2. Check Schedule
-                elif parsed["action"] == "check_schedule":
-                    schedule = check_schedule(creds, parsed["date_time"])
-                    return {
-                        "status": "Schedule ✅",
-                        "events": schedule,
-                        "parsed": parsed
-                    }
-
-                # 3. Check Availability
-                elif parsed["action"] == "check_availability":
-                    free_slots = check_availability(creds, parsed["date_time"])
-                    return {
-                        "status": "Free Slots ✅",
-                        "slots": free_slots,
-                        "parsed": parsed
-                    }
-
-                # 4. Summarize Emails
-                elif parsed["action"] == "summarize_emails":
-                    emails = summarize_emails(
-                        creds,
-                        parsed.get("date_time"),
-                        parsed.get("query")
-                    )
-                    return {
-                        "status": "Summary ✅",
-                        "emails": emails,
-                        "parsed": parsed
-                    }
-
-                # 5. Send Email
-                elif parsed["action"] == "send_email":
-                    result = send_email(creds, parsed["email"], parsed["subject"], parsed["body"])
-                    return {
-                        "status": "Email Sent ✅",
-                        "result": result,
-                        "parsed": parsed
-                    }
-
-                # 6. List Unread Emails
-                elif parsed["action"] == "list_unread":
-                    emails = list_unread(creds, parsed["date_time"])
-                    return {
-                        "status": "Unread ✅",
-                        "emails": emails,
-                        "parsed": parsed
-                    }
-
-                # 7. Search Email
-                elif parsed["action"] == "search_email":
-                    emails = search_email(creds, parsed["query"])
-                    return {
-                        "status": "Search ✅",
-                        "emails": emails,
-                        "parsed": parsed
-                    }
-
-            except (json.JSONDecodeError, KeyError) as e:
-                # Fallback for parsing errors
-                return {"status": "Error ❌", "error": f"Failed to parse action: {e}"}
-        
-        else:
-            # Fallback for non-JSON responses
+        raw_response = await gemini_task
+        logger.debug("Raw response from Gemini: %s", raw_response)
+
+        # Gemini answers with schema-constrained JSON; anything else is an error message
+        try:
+            parsed = orjson.loads(raw_response)
+        except orjson.JSONDecodeError:
             return {"status": "Message 💬", "message": raw_response}
 
+        try:
+            action = parsed["action"]
+
+            # Casual replies come back as {"action": "none", "message": ...}
+            if action == "none":
+                return {"status": "Message 💬", "message": parsed.get("message", "")}
+
+            if action == "multiple":
+                return await _handle_multiple(creds, parsed, background_tasks)
+
+            # Unknown actions fail fast, before any field checks
+            handler = ACTION_HANDLERS.get(action)
+            if handler is None:
+                return {
+                    "status": "Parsed only",
+                    "message": f"Sorry, I can't handle \"{action}\" yet.",
+                    "parsed": parsed
+                }
+
+            if parsed.get("missing_fields"):
+                # Properly format the list of missing fields
+                missing_fields_str = ', '.join(parsed['missing_fields'])
+                return {
+                    "status": "Need Info ❓",
+                    "message": f"To proceed, I need: {missing_fields_str}.",
+                    "parsed": parsed
+                }
+
+            return await handler(creds, parsed, background_tasks)
+
+        except KeyError as e:
+            # Fallback for missing fields in the parsed action
+            return {"status": "Error ❌", "error": f"Failed to parse action: {e}"}
+
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Static replies are serialized once and the same response object is reused
+_ROOT_RESPONSE = ORJSONResponse({"message": "Smart To-Do List API is running"})
+_HEALTHY_RESPONSE = ORJSONResponse({"status": "healthy"})
+
 @app.get("/")
-def root():
+async def root():
     """Root endpoint"""
-    return {"message": "Smart To-Do List API is running"}
+    return _ROOT_RESPONSE
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return _HEALTHY_RESPONSE
\ No newline at end of file
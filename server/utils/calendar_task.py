@@ -1,9 +1,10 @@
-from googleapiclient.discovery import build
+from utils.google_service import build_service, authorized_http, READ_RETRIES
 from datetime import datetime, timedelta
 
 def create_calendar_event(creds, person: str, date_time: str, person_email: str = None, repeat: str = "none", summary_override: str = None):
 
-    service = build('calendar', 'v3', credentials=creds)
+    service = build_service("calendar", "v3")
+    http = authorized_http(creds)
 
     start_time = datetime.fromisoformat(date_time)
     end_time = start_time + timedelta(minutes=30)
@@ -24,17 +25,19 @@ def create_calendar_event(creds, person: str, date_time: str, person_email: str
     created_event = service.events().insert(
         calendarId='primary',
         body=event,
-        sendUpdates='all'  # Sends email to attendees
-    ).execute()
+        sendUpdates='all',  # Sends email to attendees
+        fields='htmlLink'
+    ).execute(http=http)
 
     return created_event.get('htmlLink')
 
 
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
+from utils.google_service import build_service, authorized_http, READ_RETRIES
+from datetime import datetime, timedelta, timezone
 
 def check_schedule(creds, date_str: str):
-    service = build("calendar", "v3", credentials=creds)
+    service = build_service("calendar", "v3")
+    http = authorized_http(creds)
 
     start = datetime.fromisoformat(date_str)
     end = start + timedelta(days=1)
@@ -44,8 +47,9 @@ def check_schedule(creds, date_str: str):
         timeMin=start.isoformat() + "Z",
         timeMax=end.isoformat() + "Z",
         singleEvents=True,
-        orderBy="startTime"
-    ).execute()
+        orderBy="startTime",
+        fields="items(summary,start)"
+    ).execute(http=http, num_retries=READ_RETRIES)
 
     events = events_result.get("items", [])
     output = []
@@ -59,30 +63,39 @@ def check_schedule(creds, date_str: str):
     return output
 
 def check_availability(creds, date_str: str):
-    service = build("calendar", "v3", credentials=creds)
+    service = build_service("calendar", "v3")
+    http = authorized_http(creds)
 
+    # Freebusy returns UTC timestamps ("...Z"), so the window is built in UTC too;
+    # comparing naive and aware datetimes would raise
     date = datetime.fromisoformat(date_str)
-    start = datetime(date.year, date.month, date.day, 9, 0)
-    end = datetime(date.year, date.month, date.day, 18, 0)
+    start = datetime(date.year, date.month, date.day, 9, 0, tzinfo=timezone.utc)
+    end = datetime(date.year, date.month, date.day, 18, 0, tzinfo=timezone.utc)
 
     body = {
-        "timeMin": start.isoformat() + "Z",
-        "timeMax": end.isoformat() + "Z",
+        "timeMin": start.isoformat(),
+        "timeMax": end.isoformat(),
         "items": [{"id": "primary"}]
     }
 
-    busy = service.freebusy().query(body=body).execute()["calendars"]["primary"]["busy"]
+    result = service.freebusy().query(body=body, fields="calendars/primary(busy,errors)").execute(http=http, num_retries=READ_RETRIES)
+    primary = result.get("calendars", {}).get("primary", {})
+    # An unreadable calendar must not be reported as a free day
+    if primary.get("errors"):
+        raise RuntimeError(f"Could not read calendar availability: {primary['errors']}")
+    # With no busy periods the mask leaves nothing under "primary"
+    busy = primary.get("busy", [])
     free_slots = []
 
     last_end = start
     for block in busy:
-        busy_start = datetime.fromisoformat(block["start"].replace("Z", "+00:00"))
+        busy_start = _parse_utc(block["start"])
         if busy_start > last_end:
             free_slots.append({
                 "from": last_end.strftime("%H:%M"),
                 "to": busy_start.strftime("%H:%M")
             })
-        last_end = datetime.fromisoformat(block["end"].replace("Z", "+00:00"))
+        last_end = max(last_end, _parse_utc(block["end"]))
 
     if last_end < end:
         free_slots.append({
@@ -93,6 +106,10 @@ def check_availability(creds, date_str: str):
     return free_slots
 
 
+def _parse_utc(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
 def build_rrule_from_repeat(repeat: str, start_time: datetime):
     if repeat == "daily":
         return "RRULE:FREQ=DAILY"
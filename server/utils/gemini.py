@@ -1,15 +1,98 @@
 import os
-import requests
-import json
-from dotenv import load_dotenv
+import httpx
+import orjson
 from datetime import datetime
-
-load_dotenv()
+from typing import Optional
+from tenacity import retry, retry_if_exception, stop_after_attempt, stop_after_delay, wait_exponential_jitter
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Shared HTTP client so the TLS connection to Gemini is kept alive between calls
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=64)
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Response schema (OpenAPI subset) so Gemini's constrained decoding only emits valid task JSON
+_TASK_PROPERTIES = {
+    "action": {
+        "type": "STRING",
+        "enum": [
+            "none", "schedule_call", "add_event", "summarize_emails", "send_email",
+            "check_schedule", "check_availability", "list_unread", "search_email"
+        ]
+    },
+    "message": {"type": "STRING", "nullable": True},
+    "person": {"type": "STRING", "nullable": True},
+    "email": {"type": "STRING", "nullable": True},
+    "date_time": {"type": "STRING", "nullable": True},
+    "repeat": {"type": "STRING", "enum": ["none", "daily", "weekly", "monthly"], "nullable": True},
+    "missing_fields": {"type": "ARRAY", "items": {"type": "STRING"}},
+    "subject": {"type": "STRING", "nullable": True},
+    "body": {"type": "STRING", "nullable": True},
+    "query": {"type": "STRING", "nullable": True}
+}
+
+# Top level additionally allows "multiple" with a list of independent tasks
+TASK_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        **_TASK_PROPERTIES,
+        "action": {
+            "type": "STRING",
+            "enum": _TASK_PROPERTIES["action"]["enum"] + ["multiple"]
+        },
+        "actions": {
+            "type": "ARRAY",
+            "items": {"type": "OBJECT", "properties": _TASK_PROPERTIES, "required": ["action"]},
+            "nullable": True
+        }
+    },
+    "required": ["action"]
+}
 
-def call_gemini(task: str):
+
+def _is_transient(exc: BaseException) -> bool:
+    """Network blips, rate limits and 5xx from Gemini are worth another try.
+
+    Timeouts are not: a slow generation that hit the 60s limit would just be
+    paid for again and hold the request for minutes.
+    """
+    if isinstance(exc, httpx.TimeoutException):
+        return False
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in (429, 500, 502, 503, 504)
+
+
+@retry(
+    stop=stop_after_attempt(3) | stop_after_delay(90),
+    wait=wait_exponential_jitter(initial=0.2, max=2),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+async def _generate(url: str, payload: dict) -> dict:
+    res = await get_client().post(url, json=payload)
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+async def call_gemini(task: str):
     today = datetime.now().strftime("%Y-%m-%d")
 
     prompt = f"""
@@ -17,7 +100,8 @@ You are a smart assistant. Today's date is {today}.
 
 If the user asks something casual, general, or conversational 
 (e.g. "How was my day?", "Tell me a joke", "What's new in tech?"), 
-reply with a short natural message.
+reply with a short natural message wrapped as JSON:
+{{"action": "none", "message": "<your reply>"}}
 
 If the user gives a task to be executed, respond ONLY with a valid JSON:
 - action: "schedule_call" | "add_event" | "summarize_emails" | "send_email" | "check_schedule" | "check_availability" | "list_unread" | "search_email"
@@ -30,6 +114,9 @@ If the user gives a task to be executed, respond ONLY with a valid JSON:
 - body: string
 - query: string
 
+If the user asks for several lookups at once (e.g. "what's on my calendar tomorrow and any unread mail?"),
+respond with {{"action": "multiple", "actions": [<one task JSON per lookup>]}}.
+
 Examples:
 ✔ If everything is present:
 {{
@@ -51,8 +138,8 @@ Examples:
   "missing_fields": ["email", "date_time"]
 }}
 
-If it's not a task at all, just respond with a short human-friendly message.
-DO NOT mix natural text and JSON together.
+If it's not a task at all, respond with {{"action": "none", "message": "<short human-friendly reply>"}}.
+Always respond with JSON only. DO NOT mix natural text and JSON together.
 
 User input:
 \"{task}\"
@@ -60,13 +147,15 @@ User input:
 
     url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-pro:generateContent?key={API_KEY}"
     payload = {
-        "contents": [{"parts": [{"text": prompt}]}]
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseSchema": TASK_SCHEMA
+        }
     }
 
     try:
-        res = requests.post(url, json=payload)
-        res.raise_for_status()
-        content = res.json()
+        content = await _generate(url, payload)
         text = content["candidates"][0]["content"]["parts"][0]["text"]
         return text.strip() if text else "[Empty response from Gemini]"
     except Exception as e:
@@ -1,8 +1,62 @@
-from googleapiclient.discovery import build
+import logging
+from utils.google_service import build_service, authorized_http, READ_RETRIES
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+
+def _get_metadata(service, message_id: str):
+    return service.users().messages().get(
+        userId="me", id=message_id, format="metadata", metadataHeaders=["Subject"],
+        fields="payload/headers,snippet"
+    )
+
+
+def _summary(response: dict) -> dict:
+    headers = {h["name"]: h["value"] for h in response.get("payload", {}).get("headers", [])}
+    return {
+        "subject": headers.get("Subject", "(No Subject)"),
+        "snippet": response.get("snippet", "")
+    }
+
+
+def _fetch_subjects(service, http, messages):
+    """Fetch subject and snippet for each message in a single batch request.
+
+    Only the Subject header is requested (format="metadata"), so no message
+    bodies come over the wire. Gets that fail inside the batch (often a
+    per-part 429) are retried one by one with backoff; if one still fails the
+    error propagates, so a partial list is never returned or cached.
+    """
+    if not messages:
+        return []
+
+    results = {}
+    failed = []
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            logger.warning("Batched Gmail get failed for message %s: %s", request_id, exception)
+            failed.append(request_id)
+            return
+        results[request_id] = _summary(response)
+
+    batch = service.new_batch_http_request(callback=_collect)
+    for msg in messages:
+        batch.add(_get_metadata(service, msg["id"]), request_id=msg["id"])
+    batch.execute(http=http)
+
+    for message_id in failed:
+        results[message_id] = _summary(
+            _get_metadata(service, message_id).execute(http=http, num_retries=READ_RETRIES)
+        )
+
+    return [results[msg["id"]] for msg in messages]
+
+
 def summarize_emails(creds, date_str: str = None, query: str = None):
-    service = build("gmail", "v1", credentials=creds)
+    service = build_service("gmail", "v1")
+    http = authorized_http(creds)
 
     if query:
         q = query
@@ -13,19 +67,10 @@ def summarize_emails(creds, date_str: str = None, query: str = None):
         today = datetime.now().strftime("%Y/%m/%d")
         q = f"after:{today}"
 
-    result = service.users().messages().list(userId="me", q=q, maxResults=5).execute()
+    result = service.users().messages().list(userId="me", q=q, maxResults=5, fields="messages/id").execute(http=http, num_retries=READ_RETRIES)
     messages = result.get("messages", [])
 
-    summaries = []
-    for msg in messages:
-        msg_data = service.users().messages().get(userId="me", id=msg["id"]).execute()
-        payload = msg_data.get("payload", {})
-        headers = payload.get("headers", [])
-        subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-        snippet = msg_data.get("snippet", "")
-        summaries.append({"subject": subject, "snippet": snippet})
-
-    return summaries
+    return _fetch_subjects(service, http, messages)
 
 
 
@@ -38,42 +83,27 @@ def send_email(creds, to: str, subject: str, body: str):
     message["subject"] = subject
     raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
 
-    service = build("gmail", "v1", credentials=creds)
-    message = service.users().messages().send(userId="me", body={"raw": raw_message}).execute()
+    service = build_service("gmail", "v1")
+    http = authorized_http(creds)
+    message = service.users().messages().send(userId="me", body={"raw": raw_message}, fields="id").execute(http=http)
 
     return {"id": message["id"], "to": to, "subject": subject}
 
 
 def list_unread(creds, after_date: str):
-    service = build("gmail", "v1", credentials=creds)
+    service = build_service("gmail", "v1")
+    http = authorized_http(creds)
     query = f"is:unread after:{after_date}"
-    result = service.users().messages().list(userId="me", q=query, maxResults=10).execute()
+    result = service.users().messages().list(userId="me", q=query, maxResults=10, fields="messages/id").execute(http=http, num_retries=READ_RETRIES)
     messages = result.get("messages", [])
 
-    unread_emails = []
-    for msg in messages:
-        msg_data = service.users().messages().get(userId="me", id=msg["id"]).execute()
-        payload = msg_data.get("payload", {})
-        headers = payload.get("headers", [])
-        subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-        snippet = msg_data.get("snippet", "")
-        unread_emails.append({"subject": subject, "snippet": snippet})
-
-    return unread_emails
+    return _fetch_subjects(service, http, messages)
 
 
 def search_email(creds, query: str):
-    service = build("gmail", "v1", credentials=creds)
-    result = service.users().messages().list(userId="me", q=query, maxResults=5).execute()
+    service = build_service("gmail", "v1")
+    http = authorized_http(creds)
+    result = service.users().messages().list(userId="me", q=query, maxResults=5, fields="messages/id").execute(http=http, num_retries=READ_RETRIES)
     messages = result.get("messages", [])
 
-    matched = []
-    for msg in messages:
-        msg_data = service.users().messages().get(userId="me", id=msg["id"]).execute()
-        payload = msg_data.get("payload", {})
-        headers = payload.get("headers", [])
-        subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
-        snippet = msg_data.get("snippet", "")
-        matched.append({"subject": subject, "snippet": snippet})
-
-    return matched
+    return _fetch_subjects(service, http, messages)
@@ -1,42 +1,127 @@
 import os
-import json
+import orjson
+import threading
+from contextlib import contextmanager
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google.auth.exceptions import RefreshError
+from cachetools import LRUCache
 import logging
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
 
-load_dotenv()
-
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the app (main.py)
 logger = logging.getLogger(__name__)
 
-SCOPES = [
+# Immutable so it can't be changed by a caller and can be used as a cache key
+SCOPES = (
     "openid",
     "https://www.googleapis.com/auth/calendar",
     "https://www.googleapis.com/auth/gmail.readonly",
     "https://www.googleapis.com/auth/gmail.send",
     "https://www.googleapis.com/auth/userinfo.profile",
     "https://www.googleapis.com/auth/userinfo.email",
-]
+)
 
 CLIENT_SECRETS_FILE = "credentials.json"
+
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 REDIRECT_URI = f"{API_BASE_URL}/oauth2callback"
 
+# Parsed client secrets, read from disk on first use
+_client_config = None
+
+# credentials JSON (as carried in the JWT) -> Credentials, least recently used evicted first.
+# LRUCache reorders on every lookup, so all access goes through _CREDS_CACHE_LOCK.
+_CREDS_CACHE = LRUCache(maxsize=1024)
+_CREDS_CACHE_LOCK = threading.Lock()
+
+# credentials JSON -> [lock, number of threads using it], guarded by _CREDS_CACHE_LOCK.
+# One lock per JWT, so a slow refresh for one user doesn't hold up anyone else's.
+_REFRESH_LOCKS = {}
+
+# Refresh a little before expiry so a token can't lapse mid-request
+REFRESH_MARGIN = timedelta(seconds=60)
+
+# One token-endpoint transport (and its requests.Session pool) per process,
+# created on first use so it isn't inherited across a fork
+_auth_request = None
+
+def _get_auth_request() -> Request:
+    global _auth_request
+    if _auth_request is None:
+        _auth_request = Request()
+    return _auth_request
+
+@contextmanager
+def _refresh_lock(credentials_json: str):
+    """Hold the refresh lock for one credentials JSON, dropping it once nobody uses it"""
+    with _CREDS_CACHE_LOCK:
+        entry = _REFRESH_LOCKS.get(credentials_json)
+        if entry is None:
+            entry = _REFRESH_LOCKS[credentials_json] = [threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _CREDS_CACHE_LOCK:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _REFRESH_LOCKS[credentials_json]
+
+def _needs_refresh(creds) -> bool:
+    if creds.expired:
+        return True
+    return creds.expiry is not None and creds.expiry - datetime.utcnow() < REFRESH_MARGIN
+
+def _load_client_config() -> dict:
+    """Read the OAuth client secrets once and keep them in memory"""
+    global _client_config
+    if _client_config is None:
+        try:
+            with open(CLIENT_SECRETS_FILE, "rb") as f:
+                _client_config = orjson.loads(f.read())
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Client secrets file not found: {CLIENT_SECRETS_FILE}") from None
+    return _client_config
+
+# Only these fields differ per user; client id/secret and token_uri come from the
+# client config, which keeps the JWT cookie small and the client secret out of it
+_USER_TOKEN_FIELDS = ("token", "refresh_token", "expiry")
+
+def to_token_json(creds) -> str:
+    """Serialize the per-user parts of credentials for storage in the JWT"""
+    info = orjson.loads(creds.to_json())
+    token = {k: info[k] for k in _USER_TOKEN_FIELDS if k in info}
+    # to_json() leaves out None values, but from_authorized_user_info requires
+    # refresh_token even when Google didn't issue one
+    token.setdefault("refresh_token", None)
+    return orjson.dumps(token).decode()
+
+def _with_client_info(info: dict) -> dict:
+    """Fill in the app's client fields for credentials stored by to_token_json()"""
+    client = next(iter(_load_client_config().values()))  # "web" or "installed"
+    return {
+        "client_id": client["client_id"],
+        "client_secret": client["client_secret"],
+        "token_uri": client["token_uri"],
+        **info
+    }
+
+def _build_flow() -> Flow:
+    """Build an OAuth flow from the cached client config"""
+    # A Flow carries per-exchange state, so build a fresh one rather than sharing it
+    return Flow.from_client_config(
+        _load_client_config(),
+        scopes=SCOPES,
+        redirect_uri=REDIRECT_URI
+    )
+
 def get_auth_url(origin: str):
     """Generate Google OAuth authorization URL"""
     try:
-        if not os.path.exists(CLIENT_SECRETS_FILE):
-            raise FileNotFoundError(f"Client secrets file not found: {CLIENT_SECRETS_FILE}")
-        
-        flow = Flow.from_client_secrets_file(
-            CLIENT_SECRETS_FILE,
-            scopes=SCOPES,
-            redirect_uri=REDIRECT_URI
-        )
+        flow = _build_flow()
         
         auth_url, state = flow.authorization_url(
             prompt='consent',
@@ -44,37 +129,30 @@ def get_auth_url(origin: str):
             include_granted_scopes='true'
         )
         
-        logger.info(f"Generated auth URL: {auth_url}")
+        logger.debug("Generated auth URL: %s", auth_url)
         return auth_url, state
         
     except Exception as e:
-        logger.error(f"Error generating auth URL: {str(e)}")
+        logger.error("Error generating auth URL: %s", e)
         raise
 
 def exchange_code(code, origin: str):
     """Exchange authorization code for credentials"""
     try:
-        logger.info(f"Exchanging code for credentials... Code: {code[:10]}..., Origin: {origin}")
-
-        if not os.path.exists(CLIENT_SECRETS_FILE):
-            raise FileNotFoundError(f"Client secrets file not found: {CLIENT_SECRETS_FILE}")
+        logger.debug("Exchanging code for credentials... Origin: %s", origin)
 
-        flow = Flow.from_client_secrets_file(
-            CLIENT_SECRETS_FILE,
-            scopes=SCOPES,
-            redirect_uri=REDIRECT_URI
-        )
+        flow = _build_flow()
 
-        logger.info(f"Attempting to fetch token with redirect_uri: {REDIRECT_URI}")
+        logger.debug("Attempting to fetch token with redirect_uri: %s", REDIRECT_URI)
         try:
             flow.fetch_token(code=code)
         except Exception as e:
-            logger.error(f"Error during flow.fetch_token(): {str(e)}")
+            logger.error("Error during flow.fetch_token(): %s", e)
             raise
 
         creds = flow.credentials
 
-        logger.info(f"Token fetched. Credentials valid: {creds.valid}, expired: {creds.expired}")
+        logger.debug("Token fetched. Credentials valid: %s, expired: %s", creds.valid, creds.expired)
 
         if not creds or not creds.valid:
             raise Exception("Invalid credentials received after token fetch")
@@ -83,42 +161,63 @@ def exchange_code(code, origin: str):
         return creds
 
     except Exception as e:
-        logger.error(f"Error exchanging code: {str(e)}")
+        logger.error("Error exchanging code: %s", e)
         raise
 
 def get_credentials_from_token(credentials_json: str):
     """Get valid credentials from JSON string (for JWT usage)"""
     try:
-        logger.info("Getting credentials from token...")
-        
         if not credentials_json:
-            logger.info("No credentials JSON provided")
+            logger.debug("No credentials JSON provided")
             return None
 
-        logger.info("Credentials JSON found. Attempting to load...")
-        creds = Credentials.from_authorized_user_info(json.loads(credentials_json), SCOPES)
+        # Reuse the Credentials built for this JWT so a refreshed access token
+        # is kept in-process instead of being refreshed again on every request
+        with _CREDS_CACHE_LOCK:
+            creds = _CREDS_CACHE.get(credentials_json)
+        if creds is None:
+            logger.debug("Credentials JSON found. Attempting to load...")
+            info = _with_client_info(orjson.loads(credentials_json))
+            creds = Credentials.from_authorized_user_info(info, SCOPES)
 
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                logger.info("Refreshing expired credentials...")
-                creds.refresh(Request())
-                logger.info("Credentials refreshed successfully")
-            except RefreshError as e:
-                logger.error(f"Failed to refresh credentials: {str(e)}")
-                return None
-            except Exception as e:
-                logger.error(f"Error refreshing credentials: {str(e)}")
-                return None
+        if creds and creds.refresh_token and _needs_refresh(creds):
+            with _refresh_lock(credentials_json):
+                # A concurrent request for the same JWT (even one that missed the
+                # cache and built its own Credentials) may have refreshed and cached
+                # them while we waited; use that copy instead of refreshing again
+                with _CREDS_CACHE_LOCK:
+                    cached = _CREDS_CACHE.get(credentials_json)
+                if cached is not None:
+                    creds = cached
+                if _needs_refresh(creds):
+                    try:
+                        logger.debug("Refreshing expired credentials...")
+                        creds.refresh(_get_auth_request())
+                        logger.debug("Credentials refreshed successfully")
+                        # Cache before releasing the lock so waiters pick this copy up
+                        with _CREDS_CACHE_LOCK:
+                            _CREDS_CACHE[credentials_json] = creds
+                    except RefreshError as e:
+                        logger.error("Failed to refresh credentials: %s", e)
+                        with _CREDS_CACHE_LOCK:
+                            _CREDS_CACHE.pop(credentials_json, None)
+                        return None
+                    except Exception as e:
+                        logger.error("Error refreshing credentials: %s", e)
+                        return None
 
         if creds and creds.valid:
-            logger.info("Credentials are valid")
+            with _CREDS_CACHE_LOCK:
+                _CREDS_CACHE.setdefault(credentials_json, creds)
             return creds
         else:
-            logger.info("No valid credentials found after check/refresh")
+            logger.debug("No valid credentials found after check/refresh")
+            with _CREDS_CACHE_LOCK:
+                _CREDS_CACHE.pop(credentials_json, None)
             return None
 
     except Exception as e:
-        logger.error(f"Error getting credentials from token: {str(e)}")
+        logger.error("Error getting credentials from token: %s", e)
         return None
 
 # Keep the old function for backward compatibility (though it won't work with JWT)
@@ -126,37 +225,37 @@ def get_credentials(session):
     """Get valid credentials from session - DEPRECATED for JWT implementation"""
     logger.warning("get_credentials(session) is deprecated. Use get_credentials_from_token() instead.")
     try:
-        logger.info("Getting credentials from session...")
+        logger.debug("Getting credentials from session...")
         creds_json = session.get("credentials")
 
         if not creds_json:
-            logger.info("No credentials found in session")
+            logger.debug("No credentials found in session")
             return None
 
-        logger.info("Credentials found in session. Attempting to load...")
-        creds = Credentials.from_authorized_user_info(json.loads(creds_json), SCOPES)
+        logger.debug("Credentials found in session. Attempting to load...")
+        creds = Credentials.from_authorized_user_info(orjson.loads(creds_json), SCOPES)
 
         if creds and creds.expired and creds.refresh_token:
             try:
-                logger.info("Refreshing expired credentials...")
-                creds.refresh(Request())
+                logger.debug("Refreshing expired credentials...")
+                creds.refresh(_get_auth_request())
                 session["credentials"] = creds.to_json()
-                logger.info("Credentials refreshed and updated in session")
+                logger.debug("Credentials refreshed and updated in session")
             except RefreshError as e:
-                logger.error(f"Failed to refresh credentials: {str(e)}")
+                logger.error("Failed to refresh credentials: %s", e)
                 session.pop("credentials", None)
                 return None
             except Exception as e:
-                logger.error(f"Error refreshing credentials: {str(e)}")
+                logger.error("Error refreshing credentials: %s", e)
                 return None
 
         if creds and creds.valid:
-            logger.info("Credentials are valid")
+            logger.debug("Credentials are valid")
             return creds
         else:
-            logger.info("No valid credentials found in session after check/refresh")
+            logger.debug("No valid credentials found in session after check/refresh")
             return None
 
     except Exception as e:
-        logger.error(f"Error getting credentials from session: {str(e)}")
+        logger.error("Error getting credentials from session: %s", e)
         return None
\ No newline at end of file
@@ -0,0 +1,120 @@
+import threading
+from functools import lru_cache
+from typing import Optional
+import httpx
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+import google_auth_httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+# APIs this app talks to, warmed at startup
+GOOGLE_APIS = [
+    ("calendar", "v3"),
+    ("gmail", "v1"),
+]
+
+
+# Retries (with googleapiclient's exponential backoff) for read-only calls on 429/5xx;
+# inserts and sends are not retried so a slow success can't be duplicated
+READ_RETRIES = 2
+
+USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+# Async client for the few REST calls simple enough to skip googleapiclient
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(http2=True, timeout=15.0)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Same rule as the Gemini client: retry blips, 429 and 5xx, but not timeouts"""
+    if isinstance(exc, httpx.TimeoutException):
+        return False
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in (429, 500, 502, 503, 504)
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential_jitter(initial=0.2, max=2),
+    retry=retry_if_exception(_is_transient),
+    reraise=True
+)
+async def fetch_user_info(creds) -> dict:
+    """Fetch the signed-in user's Google profile without a threadpool hop"""
+    res = await get_client().get(
+        USERINFO_URL,
+        params={"fields": "name,email,picture"},
+        headers={"Authorization": f"Bearer {creds.token}"}
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+# httplib2.Http is not thread-safe, so each threadpool worker keeps its own;
+# reusing it keeps TLS connections to googleapis.com open between calls
+_local = threading.local()
+
+
+def _thread_http():
+    http = getattr(_local, "http", None)
+    if http is None:
+        http = build_http()
+        _local.http = http
+    return http
+
+
+@lru_cache(maxsize=None)
+def _discovery_doc(api: str, version: str) -> str:
+    """Read the discovery document bundled with google-api-python-client once"""
+    doc = get_static_doc(api, version)
+    if doc is None:
+        raise ValueError(f"No bundled discovery document for {api} {version}")
+    return doc
+
+
+def build_service(api: str, version: str):
+    """Drop-in for googleapiclient's build() that skips re-reading the discovery document.
+
+    One service per API is built on each thread and reused for every user, so
+    it carries no credentials: pass authorized_http(creds) to .execute(http=...)
+    and batch.execute(http=...). Each thread parses its own copy of the
+    discovery document because googleapiclient edits it in place while building.
+    The service must be used on the thread that built it.
+    """
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = {}
+        _local.services = services
+
+    service = services.get((api, version))
+    if service is None:
+        service = build_from_document(orjson.loads(_discovery_doc(api, version)), http=_thread_http())
+        services[(api, version)] = service
+    return service
+
+
+def authorized_http(creds):
+    """Per-call transport that signs this thread's shared Http with the user's credentials"""
+    return google_auth_httplib2.AuthorizedHttp(creds, http=_thread_http())
+
+
+def warm_discovery_docs():
+    """Load every discovery document up front so the first request doesn't pay for it"""
+    for api, version in GOOGLE_APIS:
+        _discovery_doc(api, version)
@@ -0,0 +1,91 @@
+import os
+import json
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MEMOIZE_FILE = os.getenv("MEMOIZE_FILE", "memoize.json")
+MAX_ENTRIES = 1024
+
+# key -> [raw_response, hit_count]
+_cache = {}
+
+
+def _today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _make_key(task: str) -> str:
+    """Cache key for a task: today's date plus the whitespace-normalized text.
+
+    The Gemini prompt embeds today's date, so relative phrases like
+    "tomorrow at 5pm" only resolve to the same answer on the same day.
+    """
+    return f"{_today()}|{' '.join(task.split())}"
+
+
+def get(task: str):
+    """Return the cached Gemini response for a task, or None"""
+    entry = _cache.get(_make_key(task))
+    if entry is None:
+        return None
+    entry[1] += 1
+    return entry[0]
+
+
+def _drop_stale():
+    prefix = f"{_today()}|"
+    for key in [k for k in _cache if not k.startswith(prefix)]:
+        del _cache[key]
+
+
+def put(task: str, raw_response: str):
+    """Cache a Gemini response, evicting the least frequently used entry when full"""
+    if not raw_response or raw_response.startswith("ERROR:"):
+        return
+
+    key = _make_key(task)
+    if key not in _cache and len(_cache) >= MAX_ENTRIES:
+        # Entries from earlier days can never hit again, but their old hit
+        # counts would otherwise outrank every new key for today
+        _drop_stale()
+    if key not in _cache and len(_cache) >= MAX_ENTRIES:
+        victim = min(_cache, key=lambda k: _cache[k][1])
+        del _cache[victim]
+    _cache[key] = [raw_response, _cache.get(key, [None, 0])[1]]
+
+
+def load(path: str = MEMOIZE_FILE):
+    """Load cached responses for today from disk"""
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning("Could not load memoize cache from %s: %s", path, e)
+        return
+
+    prefix = f"{_today()}|"
+    for key, entry in saved.items():
+        if key.startswith(prefix) and len(_cache) < MAX_ENTRIES:
+            _cache[key] = entry
+    logger.info("Loaded %d memoized Gemini responses", len(_cache))
+
+
+def save(path: str = MEMOIZE_FILE):
+    """Persist today's cached responses to disk.
+
+    Each worker writes its own temp file and swaps it in with os.replace, so
+    workers shutting down together can't interleave writes into one file;
+    the last one to finish wins.
+    """
+    _drop_stale()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(_cache, f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning("Could not save memoize cache to %s: %s", path, e)